@@ -0,0 +1,13 @@
+import multiprocessing
+import os
+
+bind = "0.0.0.0:{port}".format(port=os.getenv("SERVICE_PORT", "6006"))
+timeout = int(os.getenv("SERVICE_TIMEOUT", 300))
+
+# one uvicorn worker per core so that the kernel spreads accepted connections over several event loops
+workers = int(os.getenv("WORKER_COUNT", max(2, multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# import the app once in the master so that the workers share its pages, the RDS connection pool is only opened
+# on first use, so every worker opens its own
+preload_app = True
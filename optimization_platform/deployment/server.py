@@ -1,17 +1,28 @@
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List
 
+import bcrypt
 import jwt
-from fastapi import Depends, HTTPException, status
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHash, VerificationError
+from cachetools import TTLCache
+from fastapi import BackgroundTasks, Depends, HTTPException, Request, status
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 
 from config import *
 from optimization_platform.deployment.server_models import *
-from optimization_platform.src.agents.client_agent import ClientAgent
+from optimization_platform.src.agents.client_agent import ClientAgent, ClientLookupError
 from optimization_platform.src.agents.cookie_agent import CookieAgent
 from optimization_platform.src.analytics.conversion.conversion_analytics import ConversionAnalytics
 from optimization_platform.src.analytics.experiment.experiment_analytics import ExperimentAnalytics
@@ -21,6 +32,7 @@ from optimization_platform.src.agents.event_agent import EventAgent
 from optimization_platform.src.agents.experiment_agent import ExperimentAgent
 from optimization_platform.src.agents.variation_agent import VariationAgent
 from optimization_platform.src.agents.visit_agent import VisitAgent
+from utils.data_store.batch_writer import BatchWriter
 from utils.data_store.rds_data_store import RDSDataStore
 from utils.date_utils import DateUtils
 from utils.logger.pylogger import get_logger
@@ -66,7 +78,8 @@ tags_metadata = [
 
 app = FastAPI(title="Binaize",
               description="Apis for Binaize Optim", docs_url="/bdocs", redoc_url=None,
-              version="1.0.0", openapi_tags=tags_metadata, openapi_url="/api/v1/schemas/openapi.json")
+              version="1.0.0", openapi_tags=tags_metadata, openapi_url="/api/v1/schemas/openapi.json",
+              default_response_class=ORJSONResponse)
 
 origins = ["*"]
 
@@ -81,33 +94,148 @@ app.add_middleware(
 app.rds_data_store = RDSDataStore(host=AWS_RDS_HOST, port=AWS_RDS_PORT,
                                   dbname=AWS_RDS_DBNAME,
                                   user=AWS_RDS_USER,
-                                  password=AWS_RDS_PASSWORD)
+                                  password=AWS_RDS_PASSWORD,
+                                  minconn=AWS_RDS_POOL_MIN_SIZE,
+                                  maxconn=AWS_RDS_POOL_MAX_SIZE,
+                                  timeout=AWS_RDS_POOL_TIMEOUT_SECONDS)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# conversion events and visits are append only, so they are buffered and written to RDS in batches
+app.event_writer = BatchWriter(
+    write_batch=lambda events: EventAgent.register_events_for_client(data_store=app.rds_data_store, events=events),
+    max_batch_size=BATCH_WRITER_MAX_BATCH_SIZE, flush_interval=BATCH_WRITER_FLUSH_INTERVAL_SECONDS,
+    max_queue_size=BATCH_WRITER_MAX_QUEUE_SIZE)
+app.visit_writer = BatchWriter(
+    write_batch=lambda visits: VisitAgent.register_visits_for_client(data_store=app.rds_data_store, visits=visits),
+    max_batch_size=BATCH_WRITER_MAX_BATCH_SIZE, flush_interval=BATCH_WRITER_FLUSH_INTERVAL_SECONDS,
+    max_queue_size=BATCH_WRITER_MAX_QUEUE_SIZE)
+
+
+@app.on_event("startup")
+def start_batch_writers():
+    app.event_writer.start()
+    app.visit_writer.start()
+
+
+@app.on_event("shutdown")
+def stop_batch_writers():
+    app.event_writer.stop()
+    app.visit_writer.stop()
+
+
+# ResponseMessage.status is a str, the plain dict responses keep the same wire format
+_STATUS_OK = str(status.HTTP_200_OK)
+_STATUS_CONFLICT = str(status.HTTP_409_CONFLICT)
+
+# the home page is hit by every health probe, so its body is encoded once
+_HOME_PAGE_CONTENT = orjson.dumps({"message": app.description, "status": status.HTTP_200_OK})
+
+# the signing key, token lifetime and decode arguments are built once instead of on every jwt encode/decode
+_SECRET_KEY_BYTES = SECRET_KEY.encode()
+_ACCESS_TOKEN_EXPIRES = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+_JWT_ALGORITHMS = [ALGORITHM]
+# pyjwt 1.7 can only require registered time claims, the sub claim is checked by indexing the payload
+_JWT_DECODE_OPTIONS = {"require_exp": True}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/schemas/client/token")
 
+# successful logins keyed by (client_id, keyed digest of the password), stored as the hash they were verified against
+# so that a hit only counts while it still matches the client resolved through _CLIENT_CACHE
+_AUTH_CACHE = TTLCache(maxsize=AUTH_CACHE_MAX_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+_AUTH_CACHE_DIGEST_KEY = os.urandom(16)
+
+# decoded access tokens keyed by a digest of the token, stored as (client_id, expiry) so that the client itself is
+# always resolved through _CLIENT_CACHE and sees its invalidations
+_JWT_CACHE = TTLCache(maxsize=JWT_CACHE_MAX_SIZE, ttl=JWT_CACHE_TTL_SECONDS)
+
+# access tokens issued by /token keyed by client_id so that repeated logins reuse a freshly signed token
+_TOKEN_CACHE = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+# registered clients keyed by client_id so that authenticated requests do not re-read the clients table
+_CLIENT_CACHE = TTLCache(maxsize=CLIENT_CACHE_MAX_SIZE, ttl=CLIENT_CACHE_TTL_SECONDS)
+# browsers may reuse /client/details for as long as the server itself may serve it from _CLIENT_CACHE
+_CLIENT_DETAILS_CACHE_CONTROL = f"private, max-age={CLIENT_CACHE_TTL_SECONDS}"
+
+# dashboard reports keyed by the analytics function and its arguments, dashboards poll these every few seconds
+_REPORT_CACHE = TTLCache(maxsize=REPORT_CACHE_MAX_SIZE, ttl=REPORT_CACHE_TTL_SECONDS)
+
+# new passwords are hashed with argon2id unless PASSWORD_HASH_SCHEME says otherwise, bcrypt hashes are migrated on login
+_ARGON2_HASHER = PasswordHasher(time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST,
+                                parallelism=ARGON2_PARALLELISM)
+_USE_ARGON2 = PASSWORD_HASH_SCHEME == "argon2"
+
+# the encoded hash spells out the cost parameters, so large ones can outgrow clients.hashed_password
+_HASHED_PASSWORD_MAX_LENGTH = 100
+if _USE_ARGON2 and len(_ARGON2_HASHER.hash("")) > _HASHED_PASSWORD_MAX_LENGTH:
+    raise ValueError(f"argon2 hashes with ARGON2_TIME_COST={ARGON2_TIME_COST}, ARGON2_MEMORY_COST={ARGON2_MEMORY_COST} "
+                     f"and ARGON2_PARALLELISM={ARGON2_PARALLELISM} do not fit the {_HASHED_PASSWORD_MAX_LENGTH} "
+                     "character hashed_password column")
+
+# password hashing is CPU bound, so it gets its own executor sized to the cores instead of running on the event loop
+_PASSWORD_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith("$argon2"):
+        try:
+            return _ARGON2_HASHER.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHash):
+            return False
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    if _USE_ARGON2:
+        return _ARGON2_HASHER.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
 
+def password_hash_needs_update(hashed_password):
+    if hashed_password.startswith("$argon2"):
+        return not _USE_ARGON2 or _ARGON2_HASHER.check_needs_rehash(hashed_password)
+    if _USE_ARGON2:
+        return True
+    # bcrypt hashes look like $2b$<rounds>$<salt+digest>
+    rounds = int(hashed_password.split("$")[2])
+    return rounds != BCRYPT_ROUNDS
 
-def get_client(data_store, client_id: str):
-    client_details = ClientAgent.get_client_details_for_client_id(data_store=data_store, client_id=client_id)
+
+async def get_client(data_store, client_id: str):
+    user = _CLIENT_CACHE.get(client_id)
+    if user is not None:
+        return user
+    try:
+        client_details = await run_in_threadpool(ClientAgent.get_client_details_for_client_id, data_store=data_store,
+                                                 client_id=client_id)
+    except ClientLookupError:
+        # a busy or unreachable database must not read as an unknown client, that would log valid sessions out
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Could not look up the client, try again later")
     if client_details is not None:
-        return ShopifyClient(**client_details)
+        user = ShopifyClient(**client_details)
+        _CLIENT_CACHE[client_id] = user
+    return user
+
 
+def _get_auth_cache_key(client_id: str, password: str):
+    password_digest = hashlib.blake2b(password.encode(), digest_size=16, key=_AUTH_CACHE_DIGEST_KEY).digest()
+    return client_id, password_digest
 
-def authenticate_client(data_store, client_id: str, password: str):
-    user = get_client(data_store, client_id)
+
+async def authenticate_client(data_store, client_id: str, password: str):
+    user = await get_client(data_store, client_id)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    auth_cache_key = _get_auth_cache_key(client_id=client_id, password=password)
+    if _AUTH_CACHE.get(auth_cache_key) == user.hashed_password:
+        return user
+    loop = asyncio.get_event_loop()
+    if not await loop.run_in_executor(_PASSWORD_HASH_POOL, verify_password, password, user.hashed_password):
         return False
+    if password_hash_needs_update(user.hashed_password):
+        user.hashed_password = await loop.run_in_executor(_PASSWORD_HASH_POOL, get_password_hash, password)
+        await run_in_threadpool(ClientAgent.update_hashed_password_for_client_id, data_store=data_store,
+                                client_id=client_id, hashed_password=user.hashed_password)
+    _AUTH_CACHE[auth_cache_key] = user.hashed_password
     return user
 
 
@@ -115,25 +243,42 @@ def create_access_token(*, data: dict, expires_delta: timedelta):
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 async def _get_current_client(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    jwt_cache_key = hashlib.blake2s(token.encode(), digest_size=16).digest()
+    cached_token = _JWT_CACHE.get(jwt_cache_key)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        client_id = payload.get("sub")
-        user = get_client(app.rds_data_store, client_id=client_id)
-        if user is None:
-            raise credentials_exception
-        return user
+        if cached_token is not None and cached_token[1] > time.time():
+            client_id = cached_token[0]
+        else:
+            payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
+            client_id = payload["sub"]
+            _JWT_CACHE[jwt_cache_key] = (client_id, payload["exp"])
     except Exception:
-        raise credentials_exception
+        client_id = None
+    user = None
+    if client_id is not None:
+        user = await get_client(app.rds_data_store, client_id=client_id)
+    if user is None:
+        # the 401 is only built for rejected tokens, not on every authenticated request
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+async def get_report(report, data_store, **kwargs):
+    report_cache_key = (report.__qualname__, tuple(sorted(kwargs.items())))
+    result = _REPORT_CACHE.get(report_cache_key)
+    if result is None:
+        result = await run_in_threadpool(report, data_store=data_store, **kwargs)
+        _REPORT_CACHE[report_cache_key] = result
+    return result
 
 
 async def get_current_active_client(current_client: BaseClient = Depends(_get_current_client)):
@@ -144,17 +289,10 @@ async def get_current_active_client(current_client: BaseClient = Depends(_get_cu
 
 @app.get("/", response_model=dict)
 async def home_page():
-    import time
-    t = time.time()
-    response = dict()
-    response["message"] = app.description
-    response["status"] = status.HTTP_200_OK
-    logger.info("prod info message")
-    logger.info(time.time() - t)
-    return response
+    return Response(content=_HOME_PAGE_CONTENT, media_type="application/json")
 
 
-@app.post("/api/v1/schemas/client/sign_up", response_model=ResponseMessage, tags=["Client"],
+@app.post("/api/v1/schemas/client/sign_up", responses={200: {"model": ResponseMessage}}, tags=["Client"],
           summary="Sign up a new client")
 async def sign_up_new_client(new_client: NewClient):
     """
@@ -167,23 +305,25 @@ async def sign_up_new_client(new_client: NewClient):
     """
 
     creation_time = DateUtils.get_timestamp_now()
-    user = get_client(app.rds_data_store, client_id=new_client.client_id)
-    response = ResponseMessage()
-    response.message = "Client_id {client_id} is already registered.".format(
-        client_id=new_client.client_id)
-    response.status = status.HTTP_409_CONFLICT
-    if user is None:
-        hashed_password = get_password_hash(new_client.password)
-        ClientAgent.add_new_client(data_store=app.rds_data_store, client_id=new_client.client_id,
-                                   full_name=new_client.full_name,
-                                   company_name=new_client.company_name, hashed_password=hashed_password,
-                                   disabled=new_client.disabled, shopify_app_eg_url=new_client.shopify_app_eg_url,
-                                   client_timezone=new_client.client_timezone, creation_timestamp=creation_time)
-        response.message = "Sign up for new client with client_id {client_id} is successful.".format(
-            client_id=new_client.client_id)
-        response.status = status.HTTP_200_OK
-
-    return response
+    user = await get_client(app.rds_data_store, client_id=new_client.client_id)
+    if user is not None:
+        return {"message": f"Client_id {new_client.client_id} is already registered.", "status": _STATUS_CONFLICT}
+
+    loop = asyncio.get_event_loop()
+    hashed_password = await loop.run_in_executor(_PASSWORD_HASH_POOL, get_password_hash, new_client.password)
+    add_status = await run_in_threadpool(ClientAgent.add_new_client,
+                                         data_store=app.rds_data_store, client_id=new_client.client_id,
+                                         full_name=new_client.full_name,
+                                         company_name=new_client.company_name, hashed_password=hashed_password,
+                                         disabled=new_client.disabled,
+                                         shopify_app_eg_url=new_client.shopify_app_eg_url,
+                                         client_timezone=new_client.client_timezone, creation_timestamp=creation_time)
+    _CLIENT_CACHE.pop(new_client.client_id, None)
+    if add_status is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"Could not sign up client_id {new_client.client_id}, try again later")
+    return {"message": f"Sign up for new client with client_id {new_client.client_id} is successful.",
+            "status": _STATUS_OK}
 
 
 @app.post("/api/v1/schemas/client/token", response_model=Token, tags=["Client"], summary="Login and get access token")
@@ -194,23 +334,25 @@ async def login_and_get_access_token(form_data: OAuth2PasswordRequestForm = Depe
         - **password**: password used for signing up by the client
     """
 
-    user = authenticate_client(app.rds_data_store, form_data.username, form_data.password)
+    user = await authenticate_client(app.rds_data_store, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.client_id}, expires_delta=access_token_expires
-    )
+    access_token = _TOKEN_CACHE.get(user.client_id)
+    if access_token is None:
+        access_token = create_access_token(
+            data={"sub": user.client_id}, expires_delta=_ACCESS_TOKEN_EXPIRES
+        )
+        _TOKEN_CACHE[user.client_id] = access_token
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @app.get("/api/v1/schemas/client/details", response_model=Client, tags=["Client"],
          summary="Get details of a logged in client")
-async def get_client_details(*, current_client: ShopifyClient = Depends(
+async def get_client_details(*, request: Request, response: Response, current_client: ShopifyClient = Depends(
     get_current_active_client)):
     """
         Get details of a logged in client:
@@ -220,10 +362,19 @@ async def get_client_details(*, current_client: ShopifyClient = Depends(
                     company_name=current_client.company_name, disabled=current_client.disabled,
                     shopify_app_eg_url=current_client.shopify_app_eg_url,
                     client_timezone=current_client.client_timezone, creation_time=current_client.creation_time)
+    etag = f'"{hashlib.blake2s(client.json().encode(), digest_size=16).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers={"ETag": etag, "Cache-Control": _CLIENT_DETAILS_CACHE_CONTROL,
+                                 "Vary": "Authorization"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CLIENT_DETAILS_CACHE_CONTROL
+    # the details belong to the bearer token, so a browser must not serve them to another client on the same url
+    response.headers["Vary"] = "Authorization"
     return client
 
 
-@app.post("/api/v1/schemas/experiment/create", response_model=Experiment, tags=["Experiment"],
+@app.post("/api/v1/schemas/experiment/create", responses={200: {"model": Experiment}}, tags=["Experiment"],
           summary="Create a new experiment")
 async def add_experiment(*, current_client: ShopifyClient = Depends(get_current_active_client),
                          new_experiment: BaseExperiment):
@@ -236,28 +387,31 @@ async def add_experiment(*, current_client: ShopifyClient = Depends(get_current_
         - **status**: status of the experiment - *active*/*archived*/*done*
     """
     creation_time = DateUtils.get_timestamp_now()
-    last_updation_time = DateUtils.get_timestamp_now()
-    experiment = ExperimentAgent.create_experiment_for_client_id(data_store=app.rds_data_store,
-                                                                 client_id=current_client.client_id,
-                                                                 experiment_name=new_experiment.experiment_name,
-                                                                 page_type=new_experiment.page_type,
-                                                                 experiment_type=new_experiment.experiment_type,
-                                                                 status=new_experiment.status,
-                                                                 creation_time=creation_time,
-                                                                 last_updation_time=last_updation_time)
-    return experiment
-
-
-@app.get("/api/v1/schemas/experiment/list", response_model=List[Experiment], tags=["Experiment"],
+    experiment = await run_in_threadpool(ExperimentAgent.create_experiment_for_client_id, data_store=app.rds_data_store,
+                                         client_id=current_client.client_id,
+                                         experiment_name=new_experiment.experiment_name,
+                                         page_type=new_experiment.page_type,
+                                         experiment_type=new_experiment.experiment_type,
+                                         status=new_experiment.status,
+                                         creation_time=creation_time,
+                                         last_updation_time=creation_time)
+    if experiment is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Could not create the experiment")
+    return ORJSONResponse(experiment)
+
+
+@app.get("/api/v1/schemas/experiment/list", responses={200: {"model": List[Experiment]}}, tags=["Experiment"],
          summary="List down all the experiments")
 async def list_experiments(*, current_client: ShopifyClient = Depends(get_current_active_client)):
     """
         List down all the experiments for a logged in client:
         - **access_token**: access token issued by the server to the logged in client
     """
-    experiment_ids = ExperimentAgent.get_experiments_for_client_id(data_store=app.rds_data_store,
-                                                                   client_id=current_client.client_id)
-    return experiment_ids
+    experiment_ids = await run_in_threadpool(ExperimentAgent.get_experiments_for_client_id,
+                                             data_store=app.rds_data_store,
+                                             client_id=current_client.client_id)
+    return ORJSONResponse(experiment_ids)
 
 
 @app.post("/api/v1/schemas/variation/create", response_model=Variation, tags=["Variation"],
@@ -271,15 +425,16 @@ async def add_variation(*, current_client: ShopifyClient = Depends(get_current_a
         - **variation_name**: name of the variation
         - **traffic_percentage**: percentage of traffic to be redirected to this variation
     """
-    variation = VariationAgent.create_variation_for_client_id_and_experiment_id(data_store=app.rds_data_store,
-                                                                                client_id=current_client.client_id,
-                                                                                experiment_id=new_variation.experiment_id,
-                                                                                variation_name=new_variation.variation_name,
-                                                                                traffic_percentage=new_variation.traffic_percentage)
+    variation = await run_in_threadpool(VariationAgent.create_variation_for_client_id_and_experiment_id,
+                                        data_store=app.rds_data_store,
+                                        client_id=current_client.client_id,
+                                        experiment_id=new_variation.experiment_id,
+                                        variation_name=new_variation.variation_name,
+                                        traffic_percentage=new_variation.traffic_percentage)
     return variation
 
 
-@app.get("/api/v1/schemas/variation/redirection", response_model=Variation, tags=["Variation"],
+@app.get("/api/v1/schemas/variation/redirection", responses={200: {"model": Variation}}, tags=["Variation"],
          summary="Get the variation id to be redirected to")
 async def get_variation_id_to_redirect(*, client_id: str, experiment_id: str, session_id: str):
     """
@@ -288,22 +443,23 @@ async def get_variation_id_to_redirect(*, client_id: str, experiment_id: str, se
         - **experiment_id**: id of the experiment
         - **session_id**: shopify_y attribute of shopify cookie
     """
-    variation = VariationAgent.get_variation_id_to_recommend(data_store=app.rds_data_store,
-                                                             client_id=client_id,
-                                                             experiment_id=experiment_id,
-                                                             session_id=session_id)
+    variation = await run_in_threadpool(VariationAgent.get_variation_id_to_recommend, data_store=app.rds_data_store,
+                                        client_id=client_id,
+                                        experiment_id=experiment_id,
+                                        session_id=session_id)
     creation_time = DateUtils.get_timestamp_now()
-    EventAgent.register_event_for_client(data_store=app.rds_data_store, client_id=client_id,
-                                         experiment_id=experiment_id,
-                                         session_id=session_id,
-                                         variation_id=variation["variation_id"], event_name="served",
-                                         creation_time=creation_time)
+    await run_in_threadpool(EventAgent.register_event_for_client, data_store=app.rds_data_store, client_id=client_id,
+                            experiment_id=experiment_id,
+                            session_id=session_id,
+                            variation_id=variation["variation_id"], event_name="served",
+                            creation_time=creation_time)
 
-    return variation
+    return ORJSONResponse(variation)
 
 
-@app.post("/api/v1/schemas/event/register", response_model=ResponseMessage, tags=["Event"], summary="Register event")
-async def register_event(*, event: Event):
+@app.post("/api/v1/schemas/event/register", responses={200: {"model": ResponseMessage}}, tags=["Event"],
+          summary="Register event")
+async def register_event(*, event: Event, background_tasks: BackgroundTasks):
     """
         Register conversion event when a visitor visits the client's website:
         - **client_id**: the e-mail id of the new client
@@ -314,25 +470,18 @@ async def register_event(*, event: Event):
     """
 
     creation_time = DateUtils.get_timestamp_now()
-    result = EventAgent.register_event_for_client(data_store=app.rds_data_store, client_id=event.client_id,
-                                                  experiment_id=event.experiment_id,
-                                                  session_id=event.session_id, variation_id=event.variation_id,
-                                                  event_name=event.event_name, creation_time=creation_time)
-
-    response = ResponseMessage()
-    response.message = "Event registration for client_id {client_id} is successful.".format(
-        client_id=event.client_id)
-    response.status = status.HTTP_200_OK
-    if result is None:
-        response.message = "Event registration for client_id {client_id} failed.".format(
-            client_id=event.client_id)
-        response.status = status.HTTP_404_NOT_FOUND
+    event_row = {"client_id": event.client_id, "experiment_id": event.experiment_id,
+                 "session_id": event.session_id, "variation_id": event.variation_id,
+                 "event_name": event.event_name, "creation_time": creation_time}
+    if not app.event_writer.put(event_row):
+        background_tasks.add_task(EventAgent.register_event_for_client, data_store=app.rds_data_store, **event_row)
 
-    return response
+    return {"message": f"Event registration for client_id {event.client_id} is successful.", "status": _STATUS_OK}
 
 
-@app.post("/api/v1/schemas/visit/register", response_model=ResponseMessage, tags=["Visit"], summary="Register visit")
-async def register_visit(*, visit: Visit):
+@app.post("/api/v1/schemas/visit/register", responses={200: {"model": ResponseMessage}}, tags=["Visit"],
+          summary="Register visit")
+async def register_visit(*, visit: Visit, background_tasks: BackgroundTasks):
     """
         Register visit event when a visitor visits the client's website:
         - **client_id**: the e-mail id of the new client
@@ -341,40 +490,36 @@ async def register_visit(*, visit: Visit):
         - **url**: url visited by the website visitor
     """
     creation_time = DateUtils.get_timestamp_now()
-    VisitAgent.register_visit_for_client(data_store=app.rds_data_store, client_id=visit.client_id,
-                                         session_id=visit.session_id,
-                                         event_name=visit.event_name, creation_time=creation_time, url=visit.url)
+    visit_row = {"client_id": visit.client_id, "session_id": visit.session_id, "event_name": visit.event_name,
+                 "creation_time": creation_time, "url": visit.url}
+    if not app.visit_writer.put(visit_row):
+        background_tasks.add_task(VisitAgent.register_visit_for_client, data_store=app.rds_data_store, **visit_row)
 
-    response = ResponseMessage()
-    response.message = "Visit registration for client_id {client_id} and event name {event_name} is successful.".format(
-        client_id=visit.client_id, event_name=visit.event_name)
-    response.status = status.HTTP_200_OK
-    return response
+    return {"message": f"Visit registration for client_id {visit.client_id} and event name {visit.event_name} "
+                       "is successful.", "status": _STATUS_OK}
 
 
-@app.post("/api/v1/schemas/visitor/register", response_model=ResponseMessage, tags=["Visitor"],
+@app.post("/api/v1/schemas/visitor/register", responses={200: {"model": ResponseMessage}}, tags=["Visitor"],
           summary="Register visitor")
 async def register_visitor(*, visitor: Visitor):
     """
         Register visitors on the client's website:
     """
     creation_time = DateUtils.get_timestamp_now()
-    VisitorAgent.register_visitor_for_client(data_store=app.rds_data_store, client_id=visitor.client_id,
-                                             session_id=visitor.session_id, ip=visitor.ip,
-                                             city=visitor.city, region=visitor.region, country=visitor.country,
-                                             lat=visitor.lat, long=visitor.long, timezone=visitor.timezone,
-                                             browser=visitor.browser, os=visitor.os, device=visitor.device,
-                                             fingerprint=visitor.fingerprint,
-                                             creation_time=creation_time)
-
-    response = ResponseMessage()
-    response.message = "Visitor registration for client_id {client_id} and ip {ip} is successful.".format(
-        client_id=visitor.client_id, ip=visitor.ip)
-    response.status = status.HTTP_200_OK
-    return response
-
-
-@app.post("/api/v1/schemas/cookie/register", response_model=ResponseMessage, tags=["Cookie"],
+    await run_in_threadpool(VisitorAgent.register_visitor_for_client,
+                            data_store=app.rds_data_store, client_id=visitor.client_id,
+                            session_id=visitor.session_id, ip=visitor.ip,
+                            city=visitor.city, region=visitor.region, country=visitor.country,
+                            lat=visitor.lat, long=visitor.long, timezone=visitor.timezone,
+                            browser=visitor.browser, os=visitor.os, device=visitor.device,
+                            fingerprint=visitor.fingerprint,
+                            creation_time=creation_time)
+
+    return {"message": f"Visitor registration for client_id {visitor.client_id} and ip {visitor.ip} is successful.",
+            "status": _STATUS_OK}
+
+
+@app.post("/api/v1/schemas/cookie/register", responses={200: {"model": ResponseMessage}}, tags=["Cookie"],
           summary="Register cookie information")
 async def register_cookie(*, cookie: Cookie):
     """
@@ -384,26 +529,25 @@ async def register_cookie(*, cookie: Cookie):
         - **cart_token**: cart_token attribute of shopify cookie
     """
     creation_time = DateUtils.get_timestamp_now()
-    CookieAgent.register_cookie_for_client(data_store=app.rds_data_store, client_id=cookie.client_id,
-                                           session_id=cookie.session_id, cart_token=cookie.cart_token,
-                                           creation_time=creation_time)
-    experiment_id = ExperimentAgent.get_latest_experiment_id(data_store=app.rds_data_store, client_id=cookie.client_id)
+    await run_in_threadpool(CookieAgent.register_cookie_for_client,
+                            data_store=app.rds_data_store, client_id=cookie.client_id,
+                            session_id=cookie.session_id, cart_token=cookie.cart_token,
+                            creation_time=creation_time)
+    experiment_id = await run_in_threadpool(ExperimentAgent.get_latest_experiment_id,
+                                            data_store=app.rds_data_store, client_id=cookie.client_id)
     if experiment_id is not None:
-        variation = VariationAgent.get_variation_id_to_recommend(data_store=app.rds_data_store,
-                                                                 client_id=cookie.client_id,
-                                                                 experiment_id=experiment_id,
-                                                                 session_id=cookie.session_id)
+        variation = await run_in_threadpool(VariationAgent.get_variation_id_to_recommend, data_store=app.rds_data_store,
+                                            client_id=cookie.client_id,
+                                            experiment_id=experiment_id,
+                                            session_id=cookie.session_id)
         if variation is not None:
-            EventAgent.register_event_for_cookie(data_store=app.rds_data_store, client_id=cookie.client_id,
-                                                 experiment_id=experiment_id, session_id=cookie.session_id,
-                                                 event_name="served", creation_time=creation_time,
-                                                 variation_id=variation["variation_id"])
+            await run_in_threadpool(EventAgent.register_event_for_cookie,
+                                    data_store=app.rds_data_store, client_id=cookie.client_id,
+                                    experiment_id=experiment_id, session_id=cookie.session_id,
+                                    event_name="served", creation_time=creation_time,
+                                    variation_id=variation["variation_id"])
 
-    response = ResponseMessage()
-    response.message = "Cookie registration for client_id {client_id} is successful.".format(
-        client_id=cookie.client_id)
-    response.status = status.HTTP_200_OK
-    return response
+    return {"message": f"Cookie registration for client_id {cookie.client_id} is successful.", "status": _STATUS_OK}
 
 
 @app.get("/api/v1/schemas/report/conversion-over-time", response_model=dict, tags=["Report"],
@@ -417,10 +561,10 @@ async def get_goal_conversion_for_dashboard(*, current_client: ShopifyClient = D
         - **access_token**: access token issued by the server to the logged in client
         - **experiment_id**: id of the experiment
     """
-    result = ExperimentAnalytics.get_conversion_per_variation_over_time(data_store=app.rds_data_store,
-                                                                        client_id=current_client.client_id,
-                                                                        experiment_id=experiment_id,
-                                                                        timezone_str=current_client.client_timezone)
+    result = await get_report(ExperimentAnalytics.get_conversion_per_variation_over_time, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              experiment_id=experiment_id,
+                              timezone_str=current_client.client_timezone)
 
     return result
 
@@ -434,9 +578,9 @@ async def get_conversion_table_for_dashboard(*, current_client: ShopifyClient =
         - **access_token**: access token issued by the server to the logged in client
         - **experiment_id**: id of the experiment
     """
-    result = ExperimentAnalytics.get_conversion_table_of_experiment(data_store=app.rds_data_store,
-                                                                    client_id=current_client.client_id,
-                                                                    experiment_id=experiment_id)
+    result = await get_report(ExperimentAnalytics.get_conversion_table_of_experiment, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              experiment_id=experiment_id)
 
     return result
 
@@ -451,9 +595,9 @@ async def get_experiment_summary(*, current_client: ShopifyClient = Depends(get_
         - **experiment_id**: id of the experiment
     """
 
-    result = ExperimentAnalytics.get_summary_of_experiment(data_store=app.rds_data_store,
-                                                           client_id=current_client.client_id,
-                                                           experiment_id=experiment_id)
+    result = await get_report(ExperimentAnalytics.get_summary_of_experiment, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              experiment_id=experiment_id)
 
     return result
 
@@ -469,10 +613,10 @@ async def get_shop_funnel_analytics_for_dashboard(*,
         - **start_date**: start date in YYYY-MM-DD format
         - **end_date**: end date in YYYY-MM-DD format
     """
-    result = ConversionAnalytics.get_shop_funnel_analytics(data_store=app.rds_data_store,
-                                                           client_id=current_client.client_id,
-                                                           start_date_str=start_date, end_date_str=end_date,
-                                                           timezone_str=current_client.client_timezone)
+    result = await get_report(ConversionAnalytics.get_shop_funnel_analytics, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              start_date_str=start_date, end_date_str=end_date,
+                              timezone_str=current_client.client_timezone)
 
     return result
 
@@ -487,10 +631,10 @@ async def get_product_conversion_analytics_for_dashboard(*, current_client: Shop
         - **start_date**: start date in YYYY-MM-DD format
         - **end_date**: end date in YYYY-MM-DD format
     """
-    result = ConversionAnalytics.get_product_conversion_analytics(data_store=app.rds_data_store,
-                                                                  client_id=current_client.client_id,
-                                                                  start_date_str=start_date, end_date_str=end_date,
-                                                                  timezone_str=current_client.client_timezone)
+    result = await get_report(ConversionAnalytics.get_product_conversion_analytics, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              start_date_str=start_date, end_date_str=end_date,
+                              timezone_str=current_client.client_timezone)
 
     return result
 
@@ -507,10 +651,10 @@ async def get_landing_page_analytics_for_dashboard(*,
         - **start_date**: start date in YYYY-MM-DD format
         - **end_date**: end date in YYYY-MM-DD format
     """
-    result = ConversionAnalytics.get_landing_page_analytics(data_store=app.rds_data_store,
-                                                            client_id=current_client.client_id,
-                                                            start_date_str=start_date, end_date_str=end_date,
-                                                            timezone_str=current_client.client_timezone)
+    result = await get_report(ConversionAnalytics.get_landing_page_analytics, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              start_date_str=start_date, end_date_str=end_date,
+                              timezone_str=current_client.client_timezone)
 
     return result
 
@@ -527,9 +671,9 @@ async def get_landing_page_analytics_for_dashboard(*,
         - **start_date**: start date in YYYY-MM-DD format
         - **end_date**: end date in YYYY-MM-DD format
     """
-    result = VisitorAnalytics.get_sales_analytics(data_store=app.rds_data_store,
-                                                  client_id=current_client.client_id,
-                                                  start_date_str=start_date, end_date_str=end_date,
-                                                  timezone_str=current_client.client_timezone)
+    result = await get_report(VisitorAnalytics.get_sales_analytics, data_store=app.rds_data_store,
+                              client_id=current_client.client_id,
+                              start_date_str=start_date, end_date_str=end_date,
+                              timezone_str=current_client.client_timezone)
 
     return result
@@ -4,6 +4,10 @@ from config import *
 from utils.date_utils import DateUtils
 
 
+class ClientLookupError(Exception):
+    """The clients table could not be read, as opposed to the client not being in it"""
+
+
 class ClientAgent(object):
 
     @classmethod
@@ -26,16 +30,28 @@ class ClientAgent(object):
         status = data_store.run_insert_into_sql(query=sql)
         return status
 
+    @classmethod
+    def update_hashed_password_for_client_id(cls, data_store, client_id, hashed_password):
+        table = TABLE_CLIENTS
+        where = "client_id='{client_id}'".format(client_id=client_id)
+        sql = """UPDATE {table} SET hashed_password='{hashed_password}' where {where}""".format(
+            table=table, hashed_password=hashed_password, where=where)
+        status = data_store.run_update_sql(query=sql)
+        return status
+
     @classmethod
     def get_client_details_for_client_id(cls, data_store, client_id):
         table = TABLE_CLIENTS
         columns = ["client_id", "full_name", "company_name", "hashed_password", "disabled",
                    "shopify_app_eg_url", "client_timezone", "creation_time"]
-        where = "client_id='{client_id}'".format(client_id=client_id)
+        where = "client_id=$1"
 
         column = ",".join(columns)
         sql = """ SELECT {column} from {table} where {where}""".format(column=column, table=table, where=where)
-        mobile_records = data_store.run_select_sql(query=sql)
+        mobile_records = data_store.run_prepared_select_sql(name="get_client_details_for_client_id", query=sql,
+                                                            params=(client_id,))
+        if mobile_records is None:
+            raise ClientLookupError("could not look up client_id {client_id}".format(client_id=client_id))
         df = None
         if mobile_records is not None and len(mobile_records) > 0:
             df = pd.DataFrame.from_records(mobile_records)
@@ -13,14 +13,13 @@ class CookieAgent(object):
             return False
 
         columns = ["client_id", "session_id", "cart_token"]
-        where = "client_id='{client_id}' and session_id='{session_id}' and cart_token='{cart_token}'".format(
-            client_id=client_id,
-            cart_token=cart_token, session_id=session_id)
+        where = "client_id=$1 and session_id=$2 and cart_token=$3"
 
         column = ",".join(columns)
         sql = """ SELECT {column} from {table} where {where}""".format(column=column, table=table, where=where)
 
-        mobile_records = data_store.run_select_sql(query=sql)
+        mobile_records = data_store.run_prepared_select_sql(name="register_cookie_for_client", query=sql,
+                                                            params=(client_id, session_id, cart_token))
         record_exist = False
         if mobile_records is not None and len(mobile_records) > 0:
             record_exist = True
@@ -1,4 +1,5 @@
 from config import *
+from utils.data_store.rds_data_store import IteratorFile, escape_copy_value
 from utils.date_utils import DateUtils
 
 
@@ -23,6 +24,27 @@ class EventAgent(object):
         status = data_store.run_insert_into_sql(query=query)
         return status
 
+    @classmethod
+    def register_events_for_client(cls, data_store, events):
+        table = TABLE_EVENTS
+
+        columns = ["client_id", "experiment_id", "variation_id", "session_id", "event_name", "creation_time"]
+        s = "\t".join(["{}" for _ in range(len(columns))])
+        rows = list()
+        for event in events:
+            creation_time_utc_str = DateUtils.convert_timestamp_to_utc_iso_string(event["creation_time"])
+            columns_value_dict = dict(event, creation_time=creation_time_utc_str)
+            rows.append(s.format(*[escape_copy_value(columns_value_dict[key]) for key in columns]))
+
+        file = IteratorFile(iter(rows))
+        status = data_store.run_batch_insert_sql(file=file, table=table, columns=columns)
+        if status is False:
+            # a single bad row fails the whole copy, so the rows are retried one by one, any other failure
+            # (no free connection, database down) would only fail again for every single row
+            statuses = [cls.register_event_for_client(data_store=data_store, **event) for event in events]
+            status = True if None not in statuses else None
+        return status
+
     @classmethod
     def register_event_for_cookie(cls, data_store, client_id, experiment_id, variation_id, session_id, event_name,
                                   creation_time):
@@ -33,11 +55,12 @@ class EventAgent(object):
             from
                 events
             where
-                session_id='{session_id}'
-                and client_id = '{client_id}'
-                and experiment_id = '{experiment_id}'
-            """.format(client_id=client_id, experiment_id=experiment_id, session_id=session_id)
-        mobile_records = data_store.run_custom_sql(sql)
+                session_id = $1
+                and client_id = $2
+                and experiment_id = $3
+            """
+        mobile_records = data_store.run_prepared_select_sql(name="register_event_for_cookie", query=sql,
+                                                            params=(session_id, client_id, experiment_id))
         status = False
         if mobile_records is not None and len(mobile_records) == 0:
             status = EventAgent.register_event_for_client(data_store=data_store,
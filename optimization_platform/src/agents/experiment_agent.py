@@ -37,18 +37,19 @@ class ExperimentAgent(object):
         columns = ["client_id", "experiment_id", "experiment_name", "status", "page_type", "experiment_type",
                    "creation_time",
                    "last_updation_time"]
-        where = "client_id='{client_id}'".format(client_id=client_id)
+        where = "client_id=$1"
         column = ",".join(columns)
         sql = """ SELECT {column} from {table} where {where}""".format(column=column, table=table, where=where)
-        mobile_records = data_store.run_select_sql(query=sql)
+        mobile_records = data_store.run_prepared_select_sql(name="get_experiments_for_client_id", query=sql,
+                                                            params=(client_id,))
         df = None
         if mobile_records is not None and len(mobile_records) > 0:
             df = pd.DataFrame.from_records(mobile_records)
             df.columns = columns
-            df["creation_time"] = df["creation_time"].map(
-                DateUtils.convert_datetime_to_experiment_dashboard_date_string)
-            df["last_updation_time"] = df["last_updation_time"].map(
-                DateUtils.convert_datetime_to_experiment_dashboard_date_string)
+            df["creation_time"] = DateUtils.convert_datetime_series_to_experiment_dashboard_date_string(
+                df["creation_time"])
+            df["last_updation_time"] = DateUtils.convert_datetime_series_to_experiment_dashboard_date_string(
+                df["last_updation_time"])
         experiments = None
         if df is not None:
             experiments = df.to_dict(orient="records")
@@ -62,16 +63,17 @@ class ExperimentAgent(object):
                 experiment_id 
             from experiments 
             where 
-                client_id = '{client_id}' 
+                client_id = $1 
                 and last_updation_time = (
                     select 
                         max(last_updation_time) 
                     from 
                         experiments
                     where
-                        client_id = '{client_id}')
-            """.format(client_id=client_id)
-        mobile_records = data_store.run_custom_sql(sql)
+                        client_id = $1)
+            """
+        mobile_records = data_store.run_prepared_select_sql(name="get_latest_experiment_id", query=sql,
+                                                            params=(client_id,))
         latest_experiment_id = None
         if mobile_records is not None and len(mobile_records) > 0:
             latest_experiment_id = mobile_records[0][0]
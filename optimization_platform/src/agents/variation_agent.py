@@ -32,11 +32,11 @@ class VariationAgent(object):
     def get_variation_ids_for_client_id_and_experiment_id(data_store, client_id, experiment_id):
         table = TABLE_VARIATIONS
         columns = ["variation_id"]
-        where = "client_id='{client_id}' and experiment_id='{experiment_id}'".format(client_id=client_id,
-                                                                                     experiment_id=experiment_id)
+        where = "client_id=$1 and experiment_id=$2"
         column = ",".join(columns)
         sql = """ SELECT {column} from {table} where {where}""".format(column=column, table=table, where=where)
-        mobile_records = data_store.run_select_sql(query=sql)
+        mobile_records = data_store.run_prepared_select_sql(name="get_variation_ids_for_client_id_and_experiment_id",
+                                                            query=sql, params=(client_id, experiment_id))
         df = None
         if mobile_records is not None and len(mobile_records) > 0:
             df = pd.DataFrame.from_records(mobile_records)
@@ -51,14 +51,13 @@ class VariationAgent(object):
         table = TABLE_EVENTS
 
         columns = ["client_id", "experiment_id", "session_id", "variation_id"]
-        where = "client_id='{client_id}' and experiment_id='{experiment_id}' and session_id='{session_id}'".format(
-            client_id=client_id,
-            experiment_id=experiment_id, session_id=session_id)
+        where = "client_id=$1 and experiment_id=$2 and session_id=$3"
 
         column = ",".join(columns)
         sql = """ SELECT {column} from {table} where {where}""".format(column=column, table=table, where=where)
 
-        mobile_records = data_store.run_select_sql(query=sql)
+        mobile_records = data_store.run_prepared_select_sql(name="get_variation_id_to_recommend", query=sql,
+                                                            params=(client_id, experiment_id, session_id))
         df = None
         if mobile_records is not None and len(mobile_records) > 0:
             df = pd.DataFrame.from_records(mobile_records)
@@ -1,4 +1,5 @@
 from config import *
+from utils.data_store.rds_data_store import IteratorFile, escape_copy_value
 from utils.date_utils import DateUtils
 
 
@@ -20,3 +21,24 @@ class VisitAgent(object):
         sql = """insert into {table} ({column}) values {value}""".format(table=table, column=column, value=value)
         status = data_store.run_insert_into_sql(query=sql)
         return status
+
+    @classmethod
+    def register_visits_for_client(cls, data_store, visits):
+        table = TABLE_VISITS
+
+        columns = ["client_id", "session_id", "event_name", "creation_time", "url"]
+        s = "\t".join(["{}" for _ in range(len(columns))])
+        rows = list()
+        for visit in visits:
+            creation_time_utc_str = DateUtils.convert_timestamp_to_utc_iso_string(visit["creation_time"])
+            columns_value_dict = dict(visit, creation_time=creation_time_utc_str)
+            rows.append(s.format(*[escape_copy_value(columns_value_dict[key]) for key in columns]))
+
+        file = IteratorFile(iter(rows))
+        status = data_store.run_batch_insert_sql(file=file, table=table, columns=columns)
+        if status is False:
+            # a single bad row fails the whole copy, so the rows are retried one by one, any other failure
+            # (no free connection, database down) would only fail again for every single row
+            statuses = [cls.register_visit_for_client(data_store=data_store, **visit) for visit in visits]
+            status = True if None not in statuses else None
+        return status
@@ -0,0 +1,80 @@
+import time
+from unittest import TestCase
+
+from utils.data_store.batch_writer import BatchWriter
+
+
+class TestBatchWriter(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestBatchWriter, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.batches = list()
+        self.batch_writer = BatchWriter(write_batch=self._write_batch, max_batch_size=2, flush_interval=0.01,
+                                        max_queue_size=3)
+
+    def _write_batch(self, batch):
+        self.batches.append(batch)
+        return True
+
+    def test_put(self):
+        for i in range(3):
+            status = self.batch_writer.put(i)
+            self.assertEqual(first=status, second=True)
+        status = self.batch_writer.put(3)
+        self.assertEqual(first=status, second=False)
+
+    def test_flush(self):
+        for i in range(3):
+            self.batch_writer.put(i)
+        self.batch_writer.flush()
+        expected_batches = [[0, 1], [2]]
+        self.assertListEqual(list1=self.batches, list2=expected_batches)
+        self.batch_writer.flush()
+        self.assertListEqual(list1=self.batches, list2=expected_batches)
+
+    def test_start_and_stop(self):
+        self.batch_writer.start()
+        for i in range(3):
+            self.batch_writer.put(i)
+        self.batch_writer.stop()
+        rows = [row for batch in self.batches for row in batch]
+        self.assertListEqual(list1=rows, list2=[0, 1, 2])
+        for batch in self.batches:
+            self.assertLessEqual(a=len(batch), b=2)
+
+    def test_start_and_stop_with_failing_batch(self):
+        failures = list()
+
+        def write_batch(batch):
+            if len(failures) == 0:
+                failures.append(batch)
+                raise ValueError("write failed")
+            self.batches.append(batch)
+            return True
+
+        self.batch_writer.write_batch = write_batch
+        with self.assertLogs(logger="utils.data_store.batch_writer", level="ERROR"):
+            self.batch_writer.start()
+            self.batch_writer.put(0)
+            while len(failures) == 0:
+                time.sleep(0.01)
+            for i in range(1, 3):
+                self.batch_writer.put(i)
+            time.sleep(0.05)
+            self.assertTrue(expr=self.batch_writer.thread.is_alive())
+            self.batch_writer.stop()
+        self.assertListEqual(list1=failures, list2=[[0]])
+        rows = [row for batch in self.batches for row in batch]
+        self.assertListEqual(list1=rows, list2=[1, 2])
+
+    def test_flush_with_unwritten_batch(self):
+        self.batch_writer.write_batch = lambda batch: None
+        for i in range(3):
+            self.batch_writer.put(i)
+        with self.assertLogs(logger="utils.data_store.batch_writer", level="ERROR") as logs:
+            self.batch_writer.flush()
+        self.assertEqual(first=len(logs.records), second=2)
+        self.assertIn(member="batch of 2 rows", container=logs.output[0])
+        self.assertIn(member="batch of 1 rows", container=logs.output[1])
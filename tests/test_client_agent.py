@@ -72,6 +72,21 @@ class TestClientAgent(TestCase):
                            'client_timezone': 'test_client_timezone', 'creation_time': '2020-05-28'}
         self.assertDictEqual(d1=result, d2=expected_result)
 
+    def test_update_hashed_password_for_client_id(self):
+        self._add_new_client(client_id="test_client_id",
+                             full_name="test_full_name",
+                             company_name="test_company_name", hashed_password="test_hashed_password",
+                             disabled=False, shopify_app_eg_url="test_shopify_app_eg_url",
+                             client_timezone="test_client_timezone")
+        status = ClientAgent.update_hashed_password_for_client_id(data_store=self.rds_data_store,
+                                                                   client_id="test_client_id",
+                                                                   hashed_password="test_new_hashed_password")
+        expected_status = True
+        self.assertEqual(first=status, second=expected_status)
+        result = ClientAgent.get_client_details_for_client_id(data_store=self.rds_data_store,
+                                                              client_id="test_client_id")
+        self.assertEqual(first=result["hashed_password"], second="test_new_hashed_password")
+
     def test_get_all_client_ids(self):
         self._add_new_client(client_id="test_client_id_1",
                              full_name="test_full_name_1",
@@ -2,6 +2,7 @@ import datetime
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
+import pandas as pd
 import psycopg2
 import pytz
 
@@ -41,6 +42,36 @@ class TestDateUtils(TestCase):
                            ('2020-05-20T18:30:00+00:00', '2020-05-21T07:30:00+00:00', 'May 21')]
         self.assertListEqual(list1=result, list2=expected_result)
 
+    def test_get_date_range_in_utc_str_when_clocks_fall_back_at_midnight(self):
+        havana_datetime_mock = Mock(wraps=datetime.datetime)
+        havana_tz = pytz.timezone("America/Havana")
+        havana_datetime_mock.now.return_value = havana_tz.localize(datetime.datetime(2024, 11, 5, 12, 0, 0, 0))
+        with patch('datetime.datetime', new=havana_datetime_mock):
+            result = DateUtils.get_date_range_in_utc_str("America/Havana")
+        expected_result = [('2024-10-30T04:00:00+00:00', '2024-10-31T03:59:59+00:00', 'Oct 30'),
+                           ('2024-10-31T04:00:00+00:00', '2024-11-01T03:59:59+00:00', 'Oct 31'),
+                           ('2024-11-01T04:00:00+00:00', '2024-11-02T03:59:59+00:00', 'Nov 01'),
+                           ('2024-11-02T04:00:00+00:00', '2024-11-03T03:59:59+00:00', 'Nov 02'),
+                           ('2024-11-03T04:00:00+00:00', '2024-11-04T04:59:59+00:00', 'Nov 03'),
+                           ('2024-11-04T05:00:00+00:00', '2024-11-05T04:59:59+00:00', 'Nov 04'),
+                           ('2024-11-05T05:00:00+00:00', '2024-11-05T17:00:00+00:00', 'Nov 05')]
+        self.assertListEqual(list1=result, list2=expected_result)
+
+    def test_get_date_range_in_utc_str_when_clocks_fall_back_at_end_of_day(self):
+        santiago_datetime_mock = Mock(wraps=datetime.datetime)
+        santiago_tz = pytz.timezone("America/Santiago")
+        santiago_datetime_mock.now.return_value = santiago_tz.localize(datetime.datetime(2024, 4, 8, 12, 0, 0, 0))
+        with patch('datetime.datetime', new=santiago_datetime_mock):
+            result = DateUtils.get_date_range_in_utc_str("America/Santiago")
+        expected_result = [('2024-04-02T03:00:00+00:00', '2024-04-03T02:59:59+00:00', 'Apr 02'),
+                           ('2024-04-03T03:00:00+00:00', '2024-04-04T02:59:59+00:00', 'Apr 03'),
+                           ('2024-04-04T03:00:00+00:00', '2024-04-05T02:59:59+00:00', 'Apr 04'),
+                           ('2024-04-05T03:00:00+00:00', '2024-04-06T02:59:59+00:00', 'Apr 05'),
+                           ('2024-04-06T03:00:00+00:00', '2024-04-07T03:59:59+00:00', 'Apr 06'),
+                           ('2024-04-07T04:00:00+00:00', '2024-04-08T03:59:59+00:00', 'Apr 07'),
+                           ('2024-04-08T04:00:00+00:00', '2024-04-08T16:00:00+00:00', 'Apr 08')]
+        self.assertListEqual(list1=result, list2=expected_result)
+
     def test_convert_datetime_to_dashboard_formatted_string(self):
         timestampz = datetime.datetime(2020, 5, 27, 9, 15, 23,
                                        tzinfo=psycopg2.tz.FixedOffsetTimezone(offset=330, name=None))
@@ -48,6 +79,15 @@ class TestDateUtils(TestCase):
         expected_result = '27-May-2020'
         self.assertEqual(first=result, second=expected_result)
 
+    def test_convert_datetime_series_to_dashboard_formatted_string(self):
+        tzinfo = psycopg2.tz.FixedOffsetTimezone(offset=330, name=None)
+        timestampz_series = pd.Series([datetime.datetime(2020, 5, 27, 9, 15, 23, tzinfo=tzinfo),
+                                       datetime.datetime(2020, 5, 27, 2, 15, 23, tzinfo=tzinfo)])
+        result = DateUtils.convert_datetime_series_to_experiment_dashboard_date_string(
+            datetime_series=timestampz_series)
+        expected_result = ['27-May-2020', '26-May-2020']
+        self.assertListEqual(list1=result.tolist(), list2=expected_result)
+
     def test_convert_dashboard_date_string_to_iso_string(self):
         date_string = '2020-06-20'
         result = DateUtils.convert_dashboard_date_string_to_iso_string(date_string, "UTC")
@@ -1,4 +1,5 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 import testing.postgresql
 
@@ -51,6 +52,40 @@ class TestEventAgent(TestCase):
         expected_status = None
         self.assertEqual(first=status, second=expected_status)
 
+    def test_register_events_for_client(self):
+        events = [{"client_id": "test_client_id", "experiment_id": "test_experiment_id",
+                   "session_id": "test_session_id_1", "variation_id": "test_variation_id",
+                   "event_name": "test_event_name", "creation_time": 1590570923},
+                  {"client_id": "test_client_id", "experiment_id": "test_experiment_id",
+                   "session_id": "test_session_id_2", "variation_id": "test_variation_id",
+                   "event_name": "test_event_name" * 10, "creation_time": 1590570923},
+                  {"client_id": "test_client_id", "experiment_id": "test_experiment_id",
+                   "session_id": "test_session_id_3", "variation_id": "test_variation_id",
+                   "event_name": "test_event_name", "creation_time": 1590570933}]
+        status = EventAgent.register_events_for_client(data_store=self.rds_data_store, events=events[:1] + events[2:])
+        expected_status = True
+        self.assertEqual(first=status, second=expected_status)
+        result = self.rds_data_store.run_select_sql("select session_id from events order by session_id")
+        expected_result = [('test_session_id_1',), ('test_session_id_3',)]
+        self.assertListEqual(list1=expected_result, list2=result)
+
+        self.rds_data_store.run_update_sql("delete from events")
+        status = EventAgent.register_events_for_client(data_store=self.rds_data_store, events=events)
+        expected_status = None
+        self.assertEqual(first=status, second=expected_status)
+        result = self.rds_data_store.run_select_sql("select session_id from events order by session_id")
+        self.assertListEqual(list1=expected_result, list2=result)
+
+    def test_register_events_for_client_without_free_connection(self):
+        events = [{"client_id": "test_client_id", "experiment_id": "test_experiment_id",
+                   "session_id": "test_session_id_1", "variation_id": "test_variation_id",
+                   "event_name": "test_event_name", "creation_time": 1590570923}]
+        with patch.object(self.rds_data_store, "run_batch_insert_sql", return_value=None), \
+                patch.object(self.rds_data_store, "run_insert_into_sql") as run_insert_into_sql:
+            status = EventAgent.register_events_for_client(data_store=self.rds_data_store, events=events)
+        self.assertIsNone(obj=status)
+        run_insert_into_sql.assert_not_called()
+
     def test_register_event_for_cookie(self):
         status = EventAgent.register_event_for_cookie(data_store=self.rds_data_store, client_id="test_client_id",
                                                       experiment_id="test_experiment_id", event_name="test_event_name",
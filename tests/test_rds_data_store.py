@@ -1,9 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 
 import testing.postgresql
 
 from config import *
-from utils.data_store.rds_data_store import RDSDataStore, IteratorFile
+from utils.data_store.rds_data_store import RDSDataStore, IteratorFile, escape_copy_value
 
 pgsql = testing.postgresql.Postgresql(cache_initialized_db=False, port=int(AWS_RDS_PORT))
 rds_data_store = RDSDataStore(host=AWS_RDS_HOST,
@@ -54,6 +55,75 @@ class TestRDSDataStore(TestCase):
         expected_result = [(1, 'hello'), (2, 'yoo')]
         self.assertCountEqual(first=result, second=expected_result)
 
+    def test_run_prepared_select_sql(self):
+        self.rds_data_store.run_create_table_sql("CREATE TABLE hello(id int, value varchar(256))")
+        self.rds_data_store.run_insert_into_sql("INSERT INTO hello values(1, 'hello'), (2, 'ciao')")
+        query = "SELECT * FROM hello where id=$1"
+        result = self.rds_data_store.run_prepared_select_sql(name="test_hello", query=query, params=(1,))
+        expected_result = [(1, 'hello')]
+        self.assertListEqual(list1=result, list2=expected_result)
+        result = self.rds_data_store.run_prepared_select_sql(name="test_hello", query=query, params=(2,))
+        expected_result = [(2, 'ciao')]
+        self.assertListEqual(list1=result, list2=expected_result)
+
+    def test_run_prepared_select_sql_from_pool(self):
+        self.rds_data_store.run_create_table_sql("CREATE TABLE hello(id int, value varchar(256))")
+        self.rds_data_store.run_insert_into_sql("INSERT INTO hello values(1, 'hello'), (2, 'ciao')")
+        pooled_data_store = RDSDataStore(host=AWS_RDS_HOST,
+                                         port=AWS_RDS_PORT,
+                                         dbname=AWS_RDS_DBNAME,
+                                         user=AWS_RDS_USER,
+                                         password=AWS_RDS_PASSWORD,
+                                         minconn=1,
+                                         maxconn=2)
+        query = "SELECT * FROM hello where id=$1"
+
+        def run_prepared_select_sql(i):
+            return pooled_data_store.run_prepared_select_sql(name="test_hello", query=query, params=(i % 2 + 1,))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(run_prepared_select_sql, range(16)))
+        pooled_data_store.pool.closeall()
+        expected_results = [[(1, 'hello')], [(2, 'ciao')]] * 8
+        self.assertListEqual(list1=results, list2=expected_results)
+
+    def test_run_select_sql_reuses_pooled_connections(self):
+        pooled_data_store = RDSDataStore(host=AWS_RDS_HOST,
+                                         port=AWS_RDS_PORT,
+                                         dbname=AWS_RDS_DBNAME,
+                                         user=AWS_RDS_USER,
+                                         password=AWS_RDS_PASSWORD,
+                                         minconn=1,
+                                         maxconn=4)
+
+        def run_select_sql(i):
+            return pooled_data_store.run_select_sql("SELECT pg_backend_pid() FROM pg_sleep(0.2)")[0][0]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first_backend_pids = set(executor.map(run_select_sql, range(4)))
+            idle_connection_count = pooled_data_store.pool.idle_connections.qsize()
+            second_backend_pids = set(executor.map(run_select_sql, range(4)))
+        pooled_data_store.pool.closeall()
+        self.assertGreater(a=len(first_backend_pids), b=1)
+        self.assertEqual(first=idle_connection_count, second=len(first_backend_pids))
+        self.assertTrue(expr=second_backend_pids.issubset(first_backend_pids))
+
+    def test_run_select_sql_with_exhausted_pool(self):
+        pooled_data_store = RDSDataStore(host=AWS_RDS_HOST,
+                                         port=AWS_RDS_PORT,
+                                         dbname=AWS_RDS_DBNAME,
+                                         user=AWS_RDS_USER,
+                                         password=AWS_RDS_PASSWORD,
+                                         minconn=1,
+                                         maxconn=1,
+                                         timeout=0.1)
+        with pooled_data_store._get_connection():
+            self.assertIsNone(obj=pooled_data_store.run_select_sql("SELECT 1"))
+        result = pooled_data_store.run_select_sql("SELECT 1")
+        pooled_data_store.pool.closeall()
+        expected_result = [(1,)]
+        self.assertListEqual(list1=result, list2=expected_result)
+
     def test_run_custom_sql(self):
         self.rds_data_store.run_create_table_sql("CREATE TABLE hello(id int, value varchar(256))")
         self.rds_data_store.run_create_table_sql("CREATE TABLE hi(id int, value varchar(256))")
@@ -86,3 +156,25 @@ class TestRDSDataStore(TestCase):
         result = self.rds_data_store.run_custom_sql("select * from hello")
         expected_result = [('1', 2), ('2', 3), ('2', 4), ('2', 5), ('6', 7)]
         self.assertCountEqual(first=result, second=expected_result)
+
+    def test_run_batch_insert_sql_with_rejected_rows(self):
+        self.rds_data_store.run_create_table_sql("CREATE TABLE hello(id varchar(4), value bigint)")
+        file = IteratorFile(iter(["1\t2", "toolong\t3"]))
+        status = self.rds_data_store.run_batch_insert_sql(file=file, table="hello", columns=["id", "value"])
+        self.assertEqual(first=status, second=False)
+        file = IteratorFile(iter(["1\t2"]))
+        status = self.rds_data_store.run_batch_insert_sql(file=file, table="missing", columns=["id", "value"])
+        self.assertIsNone(obj=status)
+        result = self.rds_data_store.run_custom_sql("select * from hello")
+        self.assertListEqual(list1=result, list2=[])
+
+    def test_run_batch_insert_sql_with_escaped_values(self):
+        self.rds_data_store.run_create_table_sql("CREATE TABLE hello(id varchar(4), value varchar(256))")
+        data_list = [["1", "tab\there"], ["2", "new\nline"], ["3", "back\\slash"]]
+        s = "\t".join(["{}" for i in range(2)])
+        file = IteratorFile((s.format(escape_copy_value(data[0]), escape_copy_value(data[1]))
+                             for data in data_list))
+        self.rds_data_store.run_batch_insert_sql(file=file, table="hello", columns=["id", "value"])
+        result = self.rds_data_store.run_custom_sql("select * from hello")
+        expected_result = [("1", "tab\there"), ("2", "new\nline"), ("3", "back\\slash")]
+        self.assertCountEqual(first=result, second=expected_result)
@@ -1,7 +1,9 @@
+import asyncio
 import datetime
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
+import jwt
 import pytz
 import testing.postgresql
 from fastapi.testclient import TestClient
@@ -14,7 +16,8 @@ from optimization_platform.src.agents.visit_agent import VisitAgent
 pgsql = testing.postgresql.Postgresql(cache_initialized_db=True, port=int(AWS_RDS_PORT))
 params = pgsql.dsn()
 
-from optimization_platform.deployment.server import app, logger
+from optimization_platform.deployment.server import app, logger, get_report, create_access_token, _AUTH_CACHE, \
+    _JWT_CACHE, _CLIENT_CACHE, _REPORT_CACHE, _TOKEN_CACHE
 
 logger.disabled = True
 
@@ -35,8 +38,15 @@ class TestServer(TestCase):
             app.rds_data_store.run_create_table_sql(fp.read())
 
     def tearDown(self):
+        app.event_writer.flush()
+        app.visit_writer.flush()
         app.rds_data_store.run_create_table_sql("drop schema public cascade")
         app.rds_data_store.run_create_table_sql("create schema public")
+        _AUTH_CACHE.clear()
+        _JWT_CACHE.clear()
+        _CLIENT_CACHE.clear()
+        _REPORT_CACHE.clear()
+        _TOKEN_CACHE.clear()
 
     def test_home_page(self):
         response = client.get("/")
@@ -117,6 +127,169 @@ class TestServer(TestCase):
         expected_status_code = 401
         self.assertEqual(first=status_code, second=expected_status_code)
 
+    def test_sign_up_new_client_when_insert_fails(self):
+        with patch("optimization_platform.deployment.server.ClientAgent.add_new_client", return_value=None):
+            response = client.post(
+                "/api/v1/schemas/client/sign_up",
+                headers={"accept": "application/json"},
+                json={"client_id": "test_client", "company_name": "test_company_name", "full_name": "test_full_name",
+                      "disabled": False, "shopify_app_eg_url": "test_shopify_app_eg_url",
+                      "client_timezone": "Asia/Kolkata",
+                      "password": "test_password"}
+            )
+        status_code = response.status_code
+        expected_status_code = 503
+        self.assertEqual(first=status_code, second=expected_status_code)
+
+    @patch('datetime.datetime', new=datetime_mock)
+    def test_login_and_get_client_details_when_lookup_fails(self):
+        self._sign_up_new_client()
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+        access_token = response.json()["access_token"]
+        _CLIENT_CACHE.clear()
+
+        with patch.object(app.rds_data_store, "run_prepared_select_sql", return_value=None):
+            response = client.post(
+                "/api/v1/schemas/client/token",
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+            )
+            status_code = response.status_code
+            expected_status_code = 503
+            self.assertEqual(first=status_code, second=expected_status_code)
+
+            response = client.get(
+                "/api/v1/schemas/client/details",
+                headers={"Authorization": "Bearer " + access_token}
+            )
+            status_code = response.status_code
+            expected_status_code = 503
+            self.assertEqual(first=status_code, second=expected_status_code)
+
+            response = client.post(
+                "/api/v1/schemas/client/sign_up",
+                headers={"accept": "application/json"},
+                json={"client_id": "test_client", "company_name": "test_company_name", "full_name": "test_full_name",
+                      "disabled": False, "shopify_app_eg_url": "test_shopify_app_eg_url",
+                      "client_timezone": "Asia/Kolkata",
+                      "password": "test_password"}
+            )
+            status_code = response.status_code
+            expected_status_code = 503
+            self.assertEqual(first=status_code, second=expected_status_code)
+
+    def test_login_and_get_access_token_from_auth_cache(self):
+        self._sign_up_new_client()
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+        status_code = response.status_code
+        expected_status_code = 200
+        self.assertEqual(first=status_code, second=expected_status_code)
+
+        app.rds_data_store.run_update_sql("delete from clients where client_id='test_client'")
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+        status_code = response.status_code
+        expected_status_code = 200
+        self.assertEqual(first=status_code, second=expected_status_code)
+
+        _CLIENT_CACHE.clear()
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+        status_code = response.status_code
+        expected_status_code = 401
+        self.assertEqual(first=status_code, second=expected_status_code)
+        self.assertEqual(first=len(_AUTH_CACHE), second=1)
+
+    @patch('datetime.datetime', new=datetime_mock)
+    def test_login_and_get_access_token_from_token_cache(self):
+        self._sign_up_new_client()
+        access_tokens = list()
+        for _ in range(2):
+            response = client.post(
+                "/api/v1/schemas/client/token",
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+            )
+            access_tokens.append(response.json()["access_token"])
+        self.assertEqual(first=access_tokens[0], second=access_tokens[1])
+
+        _TOKEN_CACHE.clear()
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+        status_code = response.status_code
+        expected_status_code = 200
+        self.assertEqual(first=status_code, second=expected_status_code)
+        self.assertEqual(first=len(_TOKEN_CACHE), second=1)
+
+    @patch('datetime.datetime', new=datetime_mock)
+    def test_get_client_details_from_jwt_cache(self):
+        self._sign_up_new_client()
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+        access_token = response.json()["access_token"]
+
+        with patch("optimization_platform.deployment.server.jwt.decode", wraps=jwt.decode) as jwt_decode:
+            response = client.get(
+                "/api/v1/schemas/client/details",
+                headers={"Authorization": "Bearer " + access_token}
+            )
+            status_code = response.status_code
+            expected_status_code = 200
+            self.assertEqual(first=status_code, second=expected_status_code)
+
+            app.rds_data_store.run_update_sql("delete from clients where client_id='test_client'")
+            response = client.get(
+                "/api/v1/schemas/client/details",
+                headers={"Authorization": "Bearer " + access_token}
+            )
+            status_code = response.status_code
+            expected_status_code = 200
+            self.assertEqual(first=status_code, second=expected_status_code)
+
+            _CLIENT_CACHE.clear()
+            response = client.get(
+                "/api/v1/schemas/client/details",
+                headers={"Authorization": "Bearer " + access_token}
+            )
+            status_code = response.status_code
+            expected_status_code = 401
+            self.assertEqual(first=status_code, second=expected_status_code)
+            self.assertEqual(first=len(_JWT_CACHE), second=1)
+            jwt_decode.assert_called_once()
+
+    @patch('datetime.datetime', new=datetime_mock)
+    def test_get_client_details_without_sub(self):
+        self._sign_up_new_client()
+        access_token = create_access_token(data={"client_id": "test_client"},
+                                           expires_delta=datetime.timedelta(minutes=5))
+        response = client.get(
+            "/api/v1/schemas/client/details",
+            headers={"Authorization": "Bearer " + access_token.decode()}
+        )
+        status_code = response.status_code
+        expected_status_code = 401
+        self.assertEqual(first=status_code, second=expected_status_code)
+
     @patch('datetime.datetime', new=datetime_mock)
     def test_get_client_details(self):
         """ one active and one disabled client signed up"""
@@ -188,6 +361,20 @@ class TestServer(TestCase):
                                   "shopify_app_eg_url": "test_shopify_app_eg_url",
                                   "client_timezone": "Asia/Kolkata", "creation_time": "2020-05-30"}
         self.assertDictEqual(d1=response_json, d2=expected_response_json)
+        self.assertRegex(text=response.headers["Cache-Control"], expected_regex=r"^private, max-age=\d+$")
+        self.assertEqual(first=response.headers["Vary"], second="Authorization")
+
+        """send the etag of the details back for active user"""
+
+        response = client.get(
+            "/api/v1/schemas/client/details",
+            headers={"Authorization": "Bearer " + access_token, "If-None-Match": response.headers["ETag"]}
+        )
+
+        status_code = response.status_code
+        expected_status_code = 304
+        self.assertEqual(first=status_code, second=expected_status_code)
+        self.assertEqual(first=response.headers["Vary"], second="Authorization")
 
         """send an expired access token for active user"""
 
@@ -253,6 +440,37 @@ class TestServer(TestCase):
                                   'last_updation_time': '2020-05-30T07:30:00+00:00'}
         self.assertDictEqual(d1=response_json, d2=expected_response_json)
 
+    @patch('datetime.datetime', new=datetime_mock)
+    def test_add_experiment_when_create_fails(self):
+        self._sign_up_new_client()
+
+        response = client.post(
+            "/api/v1/schemas/client/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            json="grant_type=password&username=test_client&password=test_password&scope=&client_id=&client_secret="
+        )
+
+        access_token = response.json()["access_token"]
+
+        with patch("optimization_platform.deployment.server.ExperimentAgent.create_experiment_for_client_id",
+                   return_value=None):
+            response = client.post(
+                "/api/v1/schemas/experiment/create",
+                headers={"Authorization": "Bearer " + access_token},
+                json={"experiment_name": "test_experiment_name",
+                      "page_type": "test_page_type",
+                      "experiment_type": "test_experiment_type",
+                      "status": "test_status"}
+            )
+
+        status_code = response.status_code
+        expected_status_code = 500
+        self.assertEqual(first=status_code, second=expected_status_code)
+
+        response_json = response.json()
+        expected_response_json = {"detail": "Could not create the experiment"}
+        self.assertDictEqual(d1=response_json, d2=expected_response_json)
+
     @patch('datetime.datetime', new=datetime_mock)
     def test_list_experiments(self):
         self._sign_up_new_client()
@@ -477,9 +695,39 @@ class TestServer(TestCase):
         expected_status_code = 200
         self.assertEqual(first=status_code, second=expected_status_code)
         response_json = response.json()
-        expected_response_json = {'status': '404', 'message': 'Event registration for client_id test_client failed.'}
+        expected_response_json = {'status': '200',
+                                  'message': 'Event registration for client_id test_client is successful.'}
         self.assertDictEqual(d1=response_json, d2=expected_response_json)
 
+        app.event_writer.flush()
+        result = app.rds_data_store.run_select_sql("select * from events")
+        self.assertEqual(first=len(result), second=1)
+        result = list(result[0])
+        result[-1] = result[-1].isoformat()
+        expected_result = ['test_variation_id', 'test_client', 'test_experiment_id',
+                           'test_session_id', 'test_event_name', '2020-05-30T13:00:00+05:30']
+        self.assertListEqual(list1=result, list2=expected_result)
+
+    @patch('datetime.datetime', new=datetime_mock)
+    def test_register_event_with_full_buffer(self):
+        with patch.object(app.event_writer, "put", return_value=False):
+            response = client.post(
+                "/api/v1/schemas/event/register",
+                json={
+                    "client_id": "test_client",
+                    "experiment_id": "test_experiment_id",
+                    "variation_id": "test_variation_id",
+                    "session_id": "test_session_id",
+                    "event_name": "test_event_name"
+                }
+            )
+        status_code = response.status_code
+        expected_status_code = 200
+        self.assertEqual(first=status_code, second=expected_status_code)
+
+        result = app.rds_data_store.run_select_sql("select * from events")
+        self.assertEqual(first=len(result), second=1)
+
     @patch('datetime.datetime', new=datetime_mock)
     def test_register_visit(self):
         self._sign_up_new_client()
@@ -509,6 +757,7 @@ class TestServer(TestCase):
                                   'message': 'Visit registration for client_id test_client and event name test_event_name is successful.'}
         self.assertDictEqual(d1=response_json, d2=expected_response_json)
 
+        app.visit_writer.flush()
         result = app.rds_data_store.run_select_sql("select * from visits")
         result = list(result[0])
         result[-2] = result[-2].isoformat()
@@ -614,6 +863,26 @@ class TestServer(TestCase):
         expected_result = ['test_client', 'test_session_id', 'test_cart_token', '2020-05-30T13:00:00+05:30']
         self.assertCountEqual(first=result, second=expected_result)
 
+    def test_get_report(self):
+        calls = list()
+
+        def report(data_store, client_id, experiment_id):
+            calls.append((client_id, experiment_id))
+            return {"client_id": client_id, "experiment_id": experiment_id}
+
+        loop = asyncio.get_event_loop()
+        for i in range(2):
+            result = loop.run_until_complete(get_report(report, data_store=app.rds_data_store,
+                                                        client_id="test_client", experiment_id="test_experiment_id"))
+            expected_result = {"client_id": "test_client", "experiment_id": "test_experiment_id"}
+            self.assertDictEqual(d1=result, d2=expected_result)
+        self.assertListEqual(list1=calls, list2=[("test_client", "test_experiment_id")])
+
+        loop.run_until_complete(get_report(report, data_store=app.rds_data_store,
+                                           client_id="test_client", experiment_id="test_experiment_id_2"))
+        expected_calls = [("test_client", "test_experiment_id"), ("test_client", "test_experiment_id_2")]
+        self.assertListEqual(list1=calls, list2=expected_calls)
+
     def _create_event(self, variation_1, variation_2):
         timestamp = 1590673060
         variation_id_1 = variation_1["variation_id"]
@@ -13,19 +13,27 @@ rds_data_store = RDSDataStore(host=AWS_RDS_HOST,
                               user=AWS_RDS_USER,
                               password=AWS_RDS_PASSWORD)
 
+with open("rds_tables.sql", "r") as fp:
+    rds_tables_sql = fp.read()
+
 
 class TestVariationAgent(TestCase):
     def __init__(self, *args, **kwargs):
         super(TestVariationAgent, self).__init__(*args, **kwargs)
 
+    @classmethod
+    def setUpClass(cls):
+        rds_data_store.run_create_table_sql(rds_tables_sql)
+
     def setUp(self):
         self.rds_data_store = rds_data_store
-        with open("rds_tables.sql", "r") as fp:
-            self.rds_data_store.run_create_table_sql(fp.read())
 
     def tearDown(self):
-        with open("rds_tables.sql", "r") as fp:
-            self.rds_data_store.run_create_table_sql(fp.read())
+        # emptying the tables is much cheaper than recreating them, unless a test dropped one of them
+        status = self.rds_data_store.run_update_sql("truncate experiments, clients, variations, events, visits, "
+                                                    "products, orders, cookies, visitors restart identity cascade")
+        if status is None:
+            self.rds_data_store.run_create_table_sql(rds_tables_sql)
 
     def test_create_variation_for_client_id_and_experiment_id(self):
         result = VariationAgent.create_variation_for_client_id_and_experiment_id(data_store=self.rds_data_store,
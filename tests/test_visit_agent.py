@@ -1,4 +1,5 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 import testing.postgresql
 
@@ -47,3 +48,33 @@ class TestVisitAgent(TestCase):
                                                       creation_time=1590570923)
         expected_status = None
         self.assertEqual(first=status, second=expected_status)
+
+    def test_register_visits_for_client(self):
+        visits = [{"client_id": "test_client_id", "session_id": "test_session_id_1", "event_name": "test_event_name",
+                   "url": "test_url", "creation_time": 1590570923},
+                  {"client_id": "test_client_id", "session_id": "test_session_id_2",
+                   "event_name": "test_event_name" * 10, "url": "test_url", "creation_time": 1590570923},
+                  {"client_id": "test_client_id", "session_id": "test_session_id_3", "event_name": "test_event_name",
+                   "url": "test_url", "creation_time": 1590570933}]
+        status = VisitAgent.register_visits_for_client(data_store=self.rds_data_store, visits=visits[:1] + visits[2:])
+        expected_status = True
+        self.assertEqual(first=status, second=expected_status)
+        result = self.rds_data_store.run_select_sql("select session_id from visits order by session_id")
+        expected_result = [('test_session_id_1',), ('test_session_id_3',)]
+        self.assertListEqual(list1=expected_result, list2=result)
+
+        self.rds_data_store.run_update_sql("delete from visits")
+        status = VisitAgent.register_visits_for_client(data_store=self.rds_data_store, visits=visits)
+        expected_status = None
+        self.assertEqual(first=status, second=expected_status)
+        result = self.rds_data_store.run_select_sql("select session_id from visits order by session_id")
+        self.assertListEqual(list1=expected_result, list2=result)
+
+    def test_register_visits_for_client_without_free_connection(self):
+        visits = [{"client_id": "test_client_id", "session_id": "test_session_id_1", "event_name": "test_event_name",
+                   "url": "test_url", "creation_time": 1590570923}]
+        with patch.object(self.rds_data_store, "run_batch_insert_sql", return_value=None), \
+                patch.object(self.rds_data_store, "run_insert_into_sql") as run_insert_into_sql:
+            status = VisitAgent.register_visits_for_client(data_store=self.rds_data_store, visits=visits)
+        self.assertIsNone(obj=status)
+        run_insert_into_sql.assert_not_called()
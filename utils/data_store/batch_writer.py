@@ -0,0 +1,78 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter(object):
+    """ buffers rows in memory and hands them over to write_batch in batches of up to
+    max_batch_size rows, at least every flush_interval seconds, from a background thread,
+    write_batch returns None when the rows could not be written """
+
+    def __init__(self, write_batch, max_batch_size, flush_interval, max_queue_size):
+        self.write_batch = write_batch
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def put(self, row):
+        """Queue a row without blocking, returns False if the buffer is full"""
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except queue.Full:
+            return False
+
+    def _get_batch(self, timeout):
+        batch = list()
+        deadline = time.time() + timeout
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        # a failing batch is dropped, retrying it would hold back every row queued after it
+        try:
+            status = self.write_batch(batch)
+        except Exception:
+            logger.exception("dropped a batch of {size} rows".format(size=len(batch)))
+            return
+        if status is None:
+            logger.error("could not write a batch of {size} rows, the rows that failed are dropped".format(
+                size=len(batch)))
+
+    def _run(self):
+        while not self.stopped.is_set():
+            batch = self._get_batch(timeout=self.flush_interval)
+            if len(batch) > 0:
+                self._write_batch(batch)
+        self.flush()
+
+    def flush(self):
+        """Write every queued row synchronously"""
+        batch = self._get_batch(timeout=0)
+        while len(batch) > 0:
+            self._write_batch(batch)
+            batch = self._get_batch(timeout=0)
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
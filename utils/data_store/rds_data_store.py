@@ -1,44 +1,159 @@
 import io
+import queue
 import sys
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 
 import psycopg2
+from psycopg2 import DataError, IntegrityError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.pool import PoolError
+
+
+class ConnectionPool(object):
+    """ hands out at most maxconn connections at a time and keeps every returned one open for reuse,
+    callers wait up to timeout seconds for a free connection before PoolError is raised """
+
+    def __init__(self, minconn, maxconn, timeout=None, **kwargs):
+        self.kwargs = kwargs
+        self.timeout = timeout
+        # the most recently returned connection is handed out first, so the ones left idle stay idle
+        self.idle_connections = queue.LifoQueue()
+        self.free_slots = threading.BoundedSemaphore(maxconn)
+        for _ in range(minconn):
+            self.idle_connections.put(psycopg2.connect(**self.kwargs))
+
+    def getconn(self):
+        if not self.free_slots.acquire(timeout=self.timeout):
+            raise PoolError("no connection became free within {timeout} seconds".format(timeout=self.timeout))
+        # connections closed while idle (server restart, idle timeout) are skipped
+        while True:
+            try:
+                conn = self.idle_connections.get_nowait()
+            except queue.Empty:
+                break
+            if not conn.closed:
+                return conn
+        try:
+            return psycopg2.connect(**self.kwargs)
+        except Exception:
+            self.free_slots.release()
+            raise
+
+    def putconn(self, conn, close=False):
+        try:
+            if not close and not conn.closed:
+                # a connection left inside a transaction is rolled back, one in an unknown state is dropped
+                transaction_status = conn.get_transaction_status()
+                if transaction_status == TRANSACTION_STATUS_UNKNOWN:
+                    close = True
+                elif transaction_status != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            if close or conn.closed:
+                conn.close()
+            else:
+                self.idle_connections.put(conn)
+        finally:
+            self.free_slots.release()
+
+    def closeall(self):
+        """Close every idle connection, connections in use are closed when they are returned"""
+        while True:
+            try:
+                self.idle_connections.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 class RDSDataStore(object):
-    def __init__(self, host, port, dbname, user, password):
+    def __init__(self, host, port, dbname, user, password, minconn=1, maxconn=1, timeout=None):
         self.host = host
         self.port = port
         self.dbname = dbname
         self.user = user
         self.password = password
-        self.conn = psycopg2.connect(host=self.host,
-                                     port=self.port,
-                                     dbname=self.dbname,
-                                     user=self.user,
-                                     password=self.password)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        # the pool is opened on first use, so that a process which only imports the store (like a preloading
+        # gunicorn master) holds no connections and every forked worker opens its own
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        # prepared statements live in the postgres session, so they are tracked per connection
+        self.prepared_statements = defaultdict(set)
+
+    def _get_pool(self):
+        if self.pool is None:
+            with self.pool_lock:
+                if self.pool is None:
+                    self.pool = ConnectionPool(minconn=self.minconn,
+                                               maxconn=self.maxconn,
+                                               timeout=self.timeout,
+                                               host=self.host,
+                                               port=self.port,
+                                               dbname=self.dbname,
+                                               user=self.user,
+                                               password=self.password)
+        return self.pool
+
+    @contextmanager
+    def _get_connection(self):
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+            # the pool may close the connection on the way in, its prepared statements go with it
+            if conn.closed:
+                self.prepared_statements.pop(conn, None)
 
     def _run_sql_to_get_data(self, query):
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query)
-            self.conn.commit()
-            mobile_records = cursor.fetchall()
-            cursor.close()
-            return mobile_records
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                conn.commit()
+                mobile_records = cursor.fetchall()
+                cursor.close()
+                return mobile_records
         except Exception:
-            self.conn.rollback()
             return None
 
     def _run_sql_to_push_data(self, query):
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query)
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             print(e)
-            self.conn.rollback()
+            return None
+
+    def run_prepared_select_sql(self, name, query, params):
+        """ prepares query (written with $1, $2, ... placeholders) once per session under the given name
+        and executes it with params, so that postgres skips parsing and planning on repeated calls """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                prepared_statements = self.prepared_statements[conn]
+                if name not in prepared_statements:
+                    cursor.execute("PREPARE {name} AS {query}".format(name=name, query=query))
+                    prepared_statements.add(name)
+                placeholders = ",".join(["%s" for _ in params])
+                cursor.execute("EXECUTE {name} ({placeholders})".format(name=name, placeholders=placeholders), params)
+                conn.commit()
+                mobile_records = cursor.fetchall()
+                cursor.close()
+                return mobile_records
+        except Exception:
             return None
 
     def run_select_sql(self, query):
@@ -59,25 +174,29 @@ class RDSDataStore(object):
         return self._run_sql_to_push_data(query=query)
 
     def run_batch_insert_sql(self, file, table, columns):
+        """ returns False when postgres rejected the rows themselves (bad value, constraint violation)
+        and None for any other failure, such as no free connection """
         try:
-            cursor = self.conn.cursor()
-            cursor.copy_from(file=file, table=table, columns=columns)
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.copy_from(file=file, table=table, columns=columns)
+                conn.commit()
+                cursor.close()
+                return True
+        except (DataError, IntegrityError):
+            return False
         except Exception:
-            self.conn.rollback()
             return None
 
     def run_batch_delete_sql(self, query, data_list):
         try:
-            cursor = self.conn.cursor()
-            sql = cursor.mogrify(query, data_list)
-            cursor.execute(sql)
-            self.conn.commit()
-            return True
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                sql = cursor.mogrify(query, data_list)
+                cursor.execute(sql)
+                conn.commit()
+                return True
         except Exception:
-            self.conn.rollback()
             return None
 
 
@@ -106,3 +225,8 @@ class IteratorFile(io.TextIOBase):
             self._f.truncate(0)
             self._f.write(remainder)
             return data
+
+
+def escape_copy_value(value):
+    """ escape a value for a row of a text format COPY, where backslash, tab and newline are special """
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
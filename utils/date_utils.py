@@ -1,23 +1,34 @@
 import datetime
+from functools import lru_cache
 
+import pandas as pd
 import pytz
 
 
+@lru_cache(maxsize=None)
+def _get_timezone(timezone_str):
+    return pytz.timezone(timezone_str)
+
+
 class DateUtils(object):
 
     @classmethod
     def convert_timestamp_to_utc_iso_string(cls, timestamp):
-        tz = pytz.timezone('UTC')
+        tz = pytz.UTC
         datetime_utc = datetime.datetime.fromtimestamp(timestamp, tz)
         iso_string = cls.convert_datetime_to_iso_string(datetime_obj=datetime_utc)
         return iso_string
 
     @classmethod
     def convert_datetime_to_experiment_dashboard_date_string(cls, datetime_obj):
-        tz = pytz.timezone('UTC')
+        tz = pytz.UTC
         y = datetime_obj.astimezone(tz)
         return y.strftime("%d-%b-%Y")
 
+    @classmethod
+    def convert_datetime_series_to_experiment_dashboard_date_string(cls, datetime_series):
+        return pd.to_datetime(datetime_series, utc=True).dt.strftime("%d-%b-%Y")
+
     @classmethod
     def convert_datetime_to_iso_string(cls, datetime_obj):
         return datetime_obj.isoformat()
@@ -25,21 +36,23 @@ class DateUtils(object):
     @classmethod
     def get_date_range_in_utc_str(cls, client_timezone_str):
         utc_timezone_str = "UTC"
-        time_range = list()
         client_datetime_now = cls.get_datetime_now_for_timezone(timezone_str=client_timezone_str)
         numdays = 6
-        for i in range(numdays + 1):
-            date = client_datetime_now - datetime.timedelta(days=numdays - i)
-            client_date = date.strftime('%b %d')
-            start_date = date.replace(hour=0, minute=0, second=0)
-            start_date = cls.change_timezone(datetime_obj=start_date, timezone_str=utc_timezone_str)
-            start_date_utc_str = cls.convert_datetime_to_iso_string(datetime_obj=start_date)
-            end_date = client_datetime_now
-            if i != numdays:
-                end_date = date.replace(hour=23, minute=59, second=59)
-            end_date = cls.change_timezone(datetime_obj=end_date, timezone_str=utc_timezone_str)
-            end_date_utc_str = cls.convert_datetime_to_iso_string(datetime_obj=end_date)
-            time_range.append((start_date_utc_str, end_date_utc_str, client_date))
+        # midnights and end of days are built on the wall clock of the client and localized in one go
+        dates = pd.date_range(end=client_datetime_now.date(), periods=numdays + 1, freq="D")
+        client_dates = dates.strftime('%b %d')
+        # a wall clock time repeated when the clocks fall back starts the day at its first (dst) occurrence
+        # and ends it at its second one, so that no second of the day is left out
+        start_dates = dates.tz_localize(client_timezone_str, ambiguous=[True] * len(dates),
+                                        nonexistent="shift_forward")
+        end_dates = (dates + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)).tz_localize(client_timezone_str,
+                                                                                       ambiguous=[False] * len(dates),
+                                                                                       nonexistent="shift_forward")
+        start_date_utc_strs = start_dates.tz_convert(utc_timezone_str).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+        end_date_utc_strs = list(end_dates.tz_convert(utc_timezone_str).strftime('%Y-%m-%dT%H:%M:%S+00:00'))
+        end_date = cls.change_timezone(datetime_obj=client_datetime_now, timezone_str=utc_timezone_str)
+        end_date_utc_strs[-1] = cls.convert_datetime_to_iso_string(datetime_obj=end_date)
+        time_range = list(zip(start_date_utc_strs, end_date_utc_strs, client_dates))
         return time_range
 
     @classmethod
@@ -49,17 +62,17 @@ class DateUtils(object):
 
     @classmethod
     def get_datetime_now_for_timezone(cls, timezone_str):
-        datetime_now_tz = datetime.datetime.now(pytz.timezone(timezone_str))
+        datetime_now_tz = datetime.datetime.now(_get_timezone(timezone_str))
         return datetime_now_tz
 
     @classmethod
     def change_timezone(cls, datetime_obj, timezone_str):
-        return datetime_obj.astimezone(pytz.timezone(timezone_str))
+        return datetime_obj.astimezone(_get_timezone(timezone_str))
 
     @classmethod
     def convert_dashboard_date_string_to_iso_string(cls, date_string, timezone_str):
         datetime_obj = datetime.datetime.strptime(date_string, '%Y-%m-%d')
-        timezone = pytz.timezone(timezone_str)
+        timezone = _get_timezone(timezone_str)
         datetime_tz = timezone.localize(datetime_obj)
         iso_str = cls.convert_datetime_to_iso_string(datetime_tz)
         return iso_str
@@ -67,13 +80,13 @@ class DateUtils(object):
     @classmethod
     def convert_datetime_to_conversion_dashboard_date_string(cls, datetime_obj, timezone_str):
         datetime_tz = cls.change_timezone(datetime_obj=datetime_obj, timezone_str=timezone_str)
-        datetime_str = datetime_tz.strftime("%Y-%m-%d")
+        datetime_str = datetime_tz.date().isoformat()
         return datetime_str
 
     @classmethod
     def convert_conversion_datestring_to_iso_string(cls, datetime_str, timezone_str):
         datetime_obj = datetime.datetime.strptime(datetime_str, '%Y-%m-%dT%H-%M-%S')
-        timezone = pytz.timezone(timezone_str)
+        timezone = _get_timezone(timezone_str)
         datetime_tz = timezone.localize(datetime_obj)
         datetime_utc = cls.change_timezone(datetime_obj=datetime_tz, timezone_str="UTC")
         iso_str = cls.convert_datetime_to_iso_string(datetime_utc)